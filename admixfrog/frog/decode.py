@@ -8,7 +8,7 @@ import numpy as np
 from random import random, seed
 
 
-@njit
+@njit(cache=True)
 def decode_runs(seq, homo_ids, het_ids, roh_ids, n_raw_states):
     n_homo = len(homo_ids)
     n_het = len(het_ids)
@@ -91,7 +91,7 @@ def decode_runs(seq, homo_ids, het_ids, roh_ids, n_raw_states):
     return runs
 
 
-@njit
+@njit(cache=True)
 def decode_runs_single(seq, n_states, keep_loc=False):
     runs = [[(i, i, i) for i in range(0)] for i in range(n_states)]  # run lengths
     for i in range(len(seq)):
@@ -110,7 +110,7 @@ def decode_runs_single(seq, n_states, keep_loc=False):
     return runs
 
 
-@njit
+@njit(cache=True)
 def nb_choice(n, p):
     u = random()
     for i in range(n):
@@ -120,12 +120,12 @@ def nb_choice(n, p):
     return i
 
 
-@njit
+@njit(cache=True)
 def post_trans(trans, emissions, beta, beta_prev, n):
     return beta / beta_prev / n * trans * emissions
 
 
-@njit
+@njit(cache=True)
 def pred_sims_rep(
     trans,
     emissions,
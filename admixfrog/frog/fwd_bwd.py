@@ -3,21 +3,21 @@ import numpy as np
 import logging
 
 
-@njit
+@njit(cache=True)
 def calc_ll(alpha0, trans_mat, emissions):
     """likelihood using forward algorithm"""
     _, n = fwd_algorithm(alpha0, emissions, trans_mat=trans_mat)
     return np.sum([np.sum(np.log(n_)) for n_ in n])
 
 
-@njit
+@njit(cache=True)
 def fwd_step(alpha_prev, E, trans_mat):
     alpha_new = (alpha_prev @ trans_mat) * E
     n = np.sum(alpha_new)
     return alpha_new / n, n
 
 
-@njit
+@njit(cache=True)
 def fwd_algorithm_single_obs(alpha0, emission, trans_mat):
     """
     calculate P(X_t | o_[1..t], a0)
@@ -49,13 +49,13 @@ def fwd_algorithm(alpha0, emissions, trans_mat):
     return alpha, n
 
 
-@njit
+@njit(cache=True)
 def bwd_step(beta_next, E, trans_mat, n):
     beta = (trans_mat * E) @ beta_next
     return beta / n
 
 
-@njit
+@njit(cache=True)
 def bwd_algorithm_single_obs(emission, trans_mat, n):
     """
     calculate P(o[t+1..n] | X) / P(o[t+1..n])
@@ -9,13 +9,13 @@ from ..utils.utils import scale_mat, scale_mat3d
 from .gllmode_emissions import _p_gt_homo, update_geno_emissions
 
 
-@njit
+@njit(cache=True)
 def snp2bin(e_out, e_in, ix):
     for i, row in enumerate(ix):
         e_out[row] *= e_in[i]
 
 
-@njit
+@njit(cache=True)
 def snp2bin2(e_out, e_in, ix, weight):
     """version with ld weight"""
     if np.all(weight == 1.0):
@@ -21,7 +21,7 @@ def _p_gt_homo(s, P, F=0, tau=1.0, res=None):
     return np.minimum(np.maximum(gt, 0), 1)  # rounding error
 
 
-@njit
+@njit(cache=True)
 def _p_gt_het(a1, b1, a2, b2, res=None):
     """Pr(G | Z) for heterozygous hidden states
 
@@ -38,7 +38,7 @@ def _p_gt_het(a1, b1, a2, b2, res=None):
     return gt
 
 
-@njit
+@njit(cache=True)
 def _p_gt_hap(a1, b1, res=None):
     """Pr(G | Z) for haploid hidden states
 
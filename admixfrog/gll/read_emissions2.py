@@ -4,7 +4,7 @@ from numba import njit
 from math import lgamma, exp
 
 
-@njit
+@njit(cache=True)
 def binom_pmf(O, N, p):
     res = np.power(p, O) * np.power(1.0 - p, N - O)
     for i, (o, n) in enumerate(zip(O, N)):
@@ -13,7 +13,7 @@ def binom_pmf(O, N, p):
     return res
 
 
-@njit
+@njit(cache=True)
 def p_reads_given_gt_gllmode(O, N, Pcont, c, error, n_obs):
     """calculates P(O | G); probabilty of anc/derived reads given genotype
     per read group
@@ -36,7 +36,7 @@ def p_reads_given_gt(*args, gt_mode=False, **kwargs):
         return p_reads_given_gt_gllmode(*args, **kwargs)
 
 
-@njit
+@njit(cache=True)
 def p_reads_given_gt_gtmode(O, N, Pcont, c, error, n_obs):
     """calculates P(O | G); probabilty of anc/derived genotype given input genotype"""
     n_gt = 3
@@ -48,7 +48,7 @@ def p_reads_given_gt_gtmode(O, N, Pcont, c, error, n_obs):
     return read_emissions
 
 
-@njit
+@njit(cache=True)
 def read2snp_emissions(read_emissions, n_snps, ix):
     n_gt = 3
     snp_emissions = np.ones((n_snps, n_gt))
@@ -1,9 +1,13 @@
+import os
+import multiprocessing as mp
+
 import numpy as np
 import logging
 import pandas as pd
 import yaml
 from pprint import pprint
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 from ..gll.read_emissions2 import p_snps_given_gt
 from ..utils.input import load_read_data, load_ref, filter_ref
@@ -23,6 +27,16 @@ from .em import em, squarem
 from .emissions import full_posterior_genotypes
 from .fstats import calc_fstats, summarize_f3, summarize_f4, summarize_pi, summarize_f2
 
+def _fit_jackknife(args):
+    """fit one jackknife replicate; module-level so worker processes can unpickle it
+
+    the replicate is built inside the worker, so the parent never holds
+    more than the full data set
+    """
+    pars0, data, i, controller = args
+    return squarem(pars0, data.jackknife_sample(i, controller.n_resamples), controller)
+
+
 EST_DEFAULT = dict(
     [
         ("est_contamination", True),
@@ -126,13 +140,39 @@ def run_admixslug(
         jk_pars_list = []
         jk_sfs = list()
 
-        for i in range(controller.n_resamples):
-            jk_data = data.jackknife_sample(i, controller.n_resamples)
-            jk_pars = squarem(pars0, jk_data, controller)
-            # jk_pars = em(pars0, jk_data, controller)
-            jk_pars_list.append(jk_pars)
-
+        # the jackknife replicates are independent fits, so run them concurrently.
+        # the jitted kernels hold the GIL, so threads would serialize; use
+        # spawned worker processes instead (fork is unsafe once numba's
+        # parallel runtime is initialized). each worker builds its own
+        # replicate, so at most one extra copy of the read data exists per
+        # worker and none in the parent
+        if controller.n_resamples > 0:
+            n_workers = min(controller.n_resamples, os.cpu_count() or 1)
+            if n_workers == 1:
+                jk_pars_list = [
+                    squarem(
+                        pars0,
+                        data.jackknife_sample(i, controller.n_resamples),
+                        controller,
+                    )
+                    for i in range(controller.n_resamples)
+                ]
+            else:
+                ctx = mp.get_context("spawn")
+                with ProcessPoolExecutor(n_workers, mp_context=ctx) as pool:
+                    jk_pars_list = list(
+                        pool.map(
+                            _fit_jackknife,
+                            (
+                                (pars0, data, i, controller)
+                                for i in range(controller.n_resamples)
+                            ),
+                        )
+                    )
+
+        for i, jk_pars in enumerate(jk_pars_list):
             if output["output_jk_sfs"] or output["output_fstats"]:
+                jk_data = data.jackknife_sample(i, controller.n_resamples)
                 jk_sfs_row = write_sfs2(sfs, jk_pars, jk_data)
                 jk_sfs_row["rep"] = i
                 jk_sfs.append(jk_sfs_row)
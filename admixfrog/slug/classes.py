@@ -53,6 +53,18 @@ class SlugPars(object):
     def __sub__(self, other):
         return self.pars - other.pars
 
+    def copy_into(self, dst):
+        """copy state into dst, reusing dst's buffers
+
+        cheap replacement for deepcopy when a spare SlugPars is at hand
+        """
+        dst._pars[:] = self._pars
+        dst.prev_tau[:] = self.prev_tau
+        dst.prev_F[:] = self.prev_F
+        dst.prev_cont[:] = self.prev_cont
+        dst.ll, dst.prev_ll = self.ll, self.prev_ll
+        return dst
+
     @property
     def tau(self):
         return self._pars[self.tau_slice]
@@ -207,6 +219,43 @@ class SlugData:
     def OBS2SFS(self):
         return self.SNP2SFS[self.OBS2SNP]
 
+    @property
+    def diploid_mask(self):
+        """bool mask that is False at haploid SNPs; computed once, reused across EM"""
+        try:
+            return self._diploid_mask
+        except AttributeError:
+            mask = np.ones(self.n_snps, bool)
+            if self.haploid_snps is not None:
+                mask[self.haploid_snps] = False
+            mask.flags.writeable = False
+            object.__setattr__(self, "_diploid_mask", mask)
+            return mask
+
+    @property
+    def SFS_order(self):
+        """SNP indices sorted by SFS category, for grouped reductions"""
+        try:
+            return self._SFS_order
+        except AttributeError:
+            order = np.argsort(self.SNP2SFS, kind="stable")
+            order.flags.writeable = False
+            object.__setattr__(self, "_SFS_order", order)
+            return order
+
+    @property
+    def SFS_indptr(self):
+        """CSR-style offsets; SFS_order[SFS_indptr[k]:SFS_indptr[k+1]] are the SNPs of category k"""
+        try:
+            return self._SFS_indptr
+        except AttributeError:
+            indptr = np.searchsorted(
+                self.SNP2SFS[self.SFS_order], np.arange(self.n_sfs + 1)
+            )
+            indptr.flags.writeable = False
+            object.__setattr__(self, "_SFS_indptr", indptr)
+            return indptr
+
 
 @dataclass(frozen=True)
 class SlugReads:
@@ -238,12 +287,15 @@ class SlugReads:
         assert len(self.READS) == len(self.READ2RG)
         assert len(self.psi) == len(self.SNP2SFS)
         assert len(self.FLIPPED) == len(self.SNP2SFS)
-        super().__setattr__("READS", np.array(self.READS))
         super().__setattr__("psi", np.array(self.psi))
         super().__setattr__("FLIPPED", np.array(self.FLIPPED, "bool"))
-        super().__setattr__("READ2RG", np.array(self.READ2RG))
-        super().__setattr__("READ2SNP", np.array(self.READ2SNP))
         super().__setattr__("SNP2SFS", np.array(self.SNP2SFS))
+        # sort all read-indexed arrays by SNP, so the reads of each SNP form a
+        # contiguous block; READS fit in int8
+        perm = np.argsort(self.READ2SNP, kind="stable")
+        super().__setattr__("READS", np.array(self.READS, "int8")[perm])
+        super().__setattr__("READ2RG", np.array(self.READ2RG)[perm])
+        super().__setattr__("READ2SNP", np.array(self.READ2SNP)[perm])
         # give option to set n_sfs and n_rgs manually for resampling which may toss out some..
         if self.n_sfs is None:
             super().__setattr__("n_sfs", np.max(self.SNP2SFS) + 1)
@@ -306,7 +358,66 @@ class SlugReads:
 
     @property
     def FLIPPED_READS(self):
-        return self.FLIPPED[self.READ2SNP]
+        """FLIPPED gathered per read; cached, since reads are immutable"""
+        try:
+            return self._FLIPPED_READS
+        except AttributeError:
+            flipped = self.FLIPPED[self.READ2SNP]
+            flipped.flags.writeable = False
+            object.__setattr__(self, "_FLIPPED_READS", flipped)
+            return flipped
+
+    @property
+    def read_block_starts(self):
+        """offsets of each SNP's contiguous read block
+
+        READ2SNP is sorted at construction, so reads of SNP l are
+        READS[read_block_starts[l]:read_block_starts[l+1]]
+        """
+        try:
+            return self._read_block_starts
+        except AttributeError:
+            starts = np.searchsorted(self.READ2SNP, np.arange(self.n_snps + 1))
+            starts.flags.writeable = False
+            object.__setattr__(self, "_read_block_starts", starts)
+            return starts
+
+    @property
+    def diploid_mask(self):
+        """bool mask that is False at haploid SNPs; computed once, reused across EM"""
+        try:
+            return self._diploid_mask
+        except AttributeError:
+            mask = np.ones(self.n_snps, bool)
+            if self.haploid_snps is not None:
+                mask[self.haploid_snps] = False
+            mask.flags.writeable = False
+            object.__setattr__(self, "_diploid_mask", mask)
+            return mask
+
+    @property
+    def SFS_order(self):
+        """SNP indices sorted by SFS category, for grouped reductions"""
+        try:
+            return self._SFS_order
+        except AttributeError:
+            order = np.argsort(self.SNP2SFS, kind="stable")
+            order.flags.writeable = False
+            object.__setattr__(self, "_SFS_order", order)
+            return order
+
+    @property
+    def SFS_indptr(self):
+        """CSR-style offsets; SFS_order[SFS_indptr[k]:SFS_indptr[k+1]] are the SNPs of category k"""
+        try:
+            return self._SFS_indptr
+        except AttributeError:
+            indptr = np.searchsorted(
+                self.SNP2SFS[self.SFS_order], np.arange(self.n_sfs + 1)
+            )
+            indptr.flags.writeable = False
+            object.__setattr__(self, "_SFS_indptr", indptr)
+            return indptr
 
     @classmethod
     def load(
@@ -401,6 +512,7 @@ class SlugController:
     update_delta: bool = False
     update_bias: bool = False
     update_F: bool = True
+    use_numba: bool = True
     n_iter: int = 200
     ll_tol: float = 0.01
     param_tol: float = 1e-4
@@ -1,18 +1,105 @@
+import os
+from math import log
+
 from scipy.optimize import minimize
 import numpy as np
+from numba import njit, prange
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from .emissions import fwd_p_g
 from .emissions import bwd_p_o_given_x
 from .emissions import bwd_p_one_o_given_g, bwd_p_all_o_given_g
 from .emissions import fwd_p_x, fwd_p_x_cont, fwd_p_x_nocont
 from .emissions import posterior_g, posterior_x, posterior_c
 from .emissions import calc_ll, calc_full_ll
+from .emissions_numba import em_step_fused, calc_ll_fused
 from ..utils.log import log_
 
 
 def norm(self):
     """simple L2 - norm function to test parameter vector convergence and squarem steps"""
-    return np.sqrt(np.nansum(np.power(self, 2)))
+    a = np.asarray(self).ravel()
+    return np.sqrt(a @ a)  # pars cannot contain NaN, so no nansum needed
+
+
+def _sfs_posterior_sums(post_g, data):
+    """Σ post_g per SFS category, i.e. np.add.at(Gsum, data.SNP2SFS, post_g)
+
+    uses the SFS grouping cached on data, so each call is a single gather
+    and grouped reduction instead of re-deriving the group structure
+    """
+    order, indptr = data.SFS_order, data.SFS_indptr
+    Gsum = np.zeros((data.n_sfs, 3))
+    nonempty = indptr[:-1] < indptr[1:]
+    if np.any(nonempty):
+        Gsum[nonempty] = np.add.reduceat(post_g[order], indptr[:-1][nonempty], axis=0)
+    return Gsum
+
+
+@njit(parallel=True, cache=True)
+def _solve_ftau_batch(G, tau, F, n_iter=30):
+    """batched projected-Newton MLE for (tau, F) per SFS category
+
+    maximizes G0 log c0 + G1 log c1 + G2 log c2 over the box
+    [1e-10, 1-1e-10]²; updates tau and F in place and returns a bool
+    array marking the categories that converged
+    """
+    LO, HI = 1e-10, 1 - 1e-10
+    conv = np.zeros(G.shape[0], np.bool_)
+
+    for k in prange(G.shape[0]):
+        G0, G1, G2 = G[k, 0], G[k, 1], G[k, 2]
+        tol = 1e-6 * (G0 + G1 + G2 + 1)
+        t, f = tau[k], F[k]
+
+        for _ in range(n_iter):
+            c0 = f * (1 - t) + (1 - f) * (1 - t) ** 2
+            c1 = (1 - f) * 2 * t * (1 - t)
+            c2 = f * t + (1 - f) * t * t
+            r0, r1, r2 = G0 / c0, G1 / c1, G2 / c2
+
+            # gradient and Hessian of the log-likelihood
+            c0_t = -f - 2 * (1 - f) * (1 - t)
+            c1_t = 2 * (1 - f) * (1 - 2 * t)
+            c2_t = f + 2 * (1 - f) * t
+            c_f = t * (1 - t)
+
+            gt = r0 * c0_t + r1 * c1_t + r2 * c2_t
+            gf = c_f * (r0 - 2 * r1 + r2)
+
+            htt = (
+                r0 * (2 * (1 - f) - c0_t * c0_t / c0)
+                + r1 * (-4 * (1 - f) - c1_t * c1_t / c1)
+                + r2 * (2 * (1 - f) - c2_t * c2_t / c2)
+            )
+            htf = (
+                r0 * ((1 - 2 * t) - c0_t * c_f / c0)
+                + r1 * (-2 * (1 - 2 * t) + 2 * c1_t * c_f / c1)
+                + r2 * ((1 - 2 * t) - c2_t * c_f / c2)
+            )
+            hff = -c_f * c_f * (r0 / c0 + 4 * r1 / c1 + r2 / c2)
+
+            done_t = np.abs(gt) < tol or (t <= LO and gt < 0) or (t >= HI and gt > 0)
+            done_f = np.abs(gf) < tol or (f <= LO and gf < 0) or (f >= HI and gf > 0)
+            if done_t and done_f:
+                conv[k] = True
+                break
+
+            det = htt * hff - htf * htf
+            if det > 0 and htt < 0:
+                st = (hff * gt - htf * gf) / det
+                sf = (htt * gf - htf * gt) / det
+            else:
+                # Hessian not negative definite; short ascent along the gradient
+                gnorm = np.sqrt(gt * gt + gf * gf) + 1e-300
+                st, sf = -0.05 * gt / gnorm, -0.05 * gf / gnorm
+
+            t = min(max(t - min(max(st, -0.1), 0.1), LO), HI)
+            f = min(max(f - min(max(sf, -0.1), 0.1), LO), HI)
+
+        tau[k], F[k] = t, f
+
+    return conv
 
 
 def update_ftau_numeric(old_F, old_tau, data, post_g, update_F=True):
@@ -46,33 +133,84 @@ def update_ftau_numeric(old_F, old_tau, data, post_g, update_F=True):
     if not update_F:
         raise NotImplemented("update_F=False currently disabled")
 
+    LO, HI = 1e-10, 1 - 1e-10
+
     tau, F = np.zeros(data.n_sfs), np.zeros(data.n_sfs)
     tau[:], F[:] = old_tau, old_F
 
-    for k in range(data.n_sfs):
-        G0, G1, G2 = np.sum(post_g[data.SNP2SFS == k], 0)
-
+    # single pass over post_g; G[k] = Σ_{l : SNP2SFS[l] = k} post_g[l]
+    G = _sfs_posterior_sums(post_g, data)
+    G0, G1, G2 = G.T
+    G_tot = G.sum(1)
+    has_obs = G_tot > 0
+
+    # tau has a closed-form MLE; categories without data keep their old value
+    tau[has_obs] = np.clip(
+        ((G1 / 2.0 + G2) / np.maximum(G_tot, 1e-300))[has_obs], LO, HI
+    )
+
+    # the log-likelihood is concave in F at fixed tau, so a few clipped Newton
+    # iterations on ∂ll/∂F = tau(1-tau) (G0/c0 - 2 G1/c1 + G2/c2) suffice
+    tt = tau * (1 - tau)
+    grad = np.zeros(data.n_sfs)
+    for _ in range(16):
+        c0 = F * (1 - tau) + (1 - F) * (1 - tau) ** 2
+        c1 = (1 - F) * 2 * tau * (1 - tau)
+        c2 = F * tau + (1 - F) * tau * tau
+        r0, r1, r2 = G0 / (c0 + 1e-300), G1 / (c1 + 1e-300), G2 / (c2 + 1e-300)
+        grad = tt * (r0 - 2 * r1 + r2)
+        hess = -tt * tt * (r0 / (c0 + 1e-300) + 4 * r1 / (c1 + 1e-300) + r2 / (c2 + 1e-300))
+        np.clip(F - grad / np.minimum(hess, -1e-300), LO, HI, out=F)
+
+    converged = (
+        (np.abs(grad) < 1e-6 * (G_tot + 1))
+        | ((F <= LO) & (grad < 0))
+        | ((F >= HI) & (grad > 0))
+        | ~has_obs
+    )
+
+    def solve_one(k):
         def f(args):
             tau_, F_ = args
 
+            # all-scalar math; the bounds keep c0, c1, c2 positive
             c0 = F_ * (1 - tau_) + (1 - F_) * (1 - tau_) ** 2
             c1 = (1 - F_) * 2 * tau_ * (1 - tau_)
             c2 = F_ * tau_ + (1 - F_) * tau_ * tau_
-            x = np.log(c0) * G0 + np.log(c1) * G1 + np.log(c2) * G2
-            if np.isnan(x):
-                raise ValueError("nan in likelihood")
-            return -x
+            x = log(c0) * G0[k] + log(c1) * G1[k] + log(c2) * G2[k]
+
+            dtau = (
+                -(F_ + 2 * (1 - F_) * (1 - tau_)) * G0[k] / c0
+                + (2 - 4 * tau_) * (1 - F_) * G1[k] / c1
+                + (F_ + 2 * (1 - F_) * tau_) * G2[k] / c2
+            )
+            dF = tau_ * (1 - tau_) * (G0[k] / c0 - 2 * G1[k] / c1 + G2[k] / c2)
+            return -x, np.array([-dtau, -dF])
 
         init = (tau[k], F[k])
-        bounds = (1e-10, 1 - 1e-10), (1e-10, 1 - 1e-10)
+        bounds = (LO, HI), (LO, HI)
 
-        prev = f(init)
-        OO = minimize(f, init, bounds=bounds, method="L-BFGS-B")
+        OO = minimize(f, init, bounds=bounds, method="L-BFGS-B", jac=True)
         if not OO.success:
             log_.debug(f"error optimizing F={OO.x[1]}, tau={OO.x[0]}, for k={k}")
-            log_.debug(f"G-ratio: {(G1/2 + G2) / (G0+G1+G2)} tau={OO.x[0]}")
+            log_.debug(f"G-ratio: {(G1[k]/2 + G2[k]) / G_tot[k]} tau={OO.x[0]}")
+
+        return OO.x
+
+    # non-converged categories first go through the jitted batch solver;
+    # scipy only sees what still fails
+    fallback = np.where(~converged)[0]
+    if len(fallback) > 0:
+        tau_fb, F_fb = tau[fallback].copy(), F[fallback].copy()
+        conv_fb = _solve_ftau_batch(G[fallback], tau_fb, F_fb)
+        tau[fallback], F[fallback] = tau_fb, F_fb
+        fallback = fallback[~conv_fb]
 
-        tau[k], F[k] = OO.x.tolist()
+    # the remaining categories are independent, so solve them concurrently
+    if len(fallback) > 0:
+        with ThreadPoolExecutor(min(len(fallback), os.cpu_count() or 1)) as pool:
+            for k, x in zip(fallback, pool.map(solve_one, fallback)):
+                tau[k], F[k] = x.tolist()
 
     return F, tau
 
@@ -108,29 +246,37 @@ def update_ftau(old_F, old_tau, data, post_g, update_F=True):
     tau, F = np.zeros(data.n_sfs), np.zeros(data.n_sfs)
     tau[:], F[:] = old_tau, old_F
 
-    for k in range(data.n_sfs):
-        G0, G1, G2 = np.sum(post_g[data.SNP2SFS == k], 0)
+    # single pass over post_g; Gsum[k] = Σ_{l : SNP2SFS[l] = k} post_g[l]
+    Gsum = _sfs_posterior_sums(post_g, data)
 
-        # update tau
-        if G0 + G1 + G2 > 0:
-            tau[k] = (G1 / 2.0 + G2) / (G0 + G1 + G2)
-        else:
-            tau[k] = 0.0
+    # update tau
+    tau = (Gsum[:, 1] / 2.0 + Gsum[:, 2]) / np.maximum(Gsum.sum(1), 1e-300)
 
-        # for F, exclude X-chromosome stuff
-        if update_F:
-            if data.haploid_snps is None:
-                pass
-            else:
-                ix1 = data.SNP2SFS == k
-                ix1[data.haploid_snps] = False
-                if np.all(~ix1):
-                    pass
-                else:
-                    G0, G1, G2 = np.sum(post_g[ix1], 0)
+    # for F, exclude X-chromosome stuff
+    if update_F:
+        if data.haploid_snps is None:
+            Gdip = Gsum
+        else:
+            diploid_mask = data.diploid_mask
+            Gdip = np.stack(
+                [
+                    np.bincount(
+                        data.SNP2SFS[diploid_mask],
+                        weights=post_g[diploid_mask, j],
+                        minlength=data.n_sfs,
+                    )
+                    for j in range(3)
+                ],
+                axis=1,
+            )
+            # categories without diploid SNPs fall back to the full sums
+            no_dip = np.bincount(data.SNP2SFS[diploid_mask], minlength=data.n_sfs) == 0
+            Gdip[no_dip] = Gsum[no_dip]
 
-            F[k] = 2 * G0 / (2 * G0 + G1 + 1e-300) - G1 / (2 * G2 + G1 + 1e-300)
-        np.clip(F, 0, 1, out=F)  # round to [0, 1]
+        F = 2 * Gdip[:, 0] / (2 * Gdip[:, 0] + Gdip[:, 1] + 1e-300) - Gdip[:, 1] / (
+            2 * Gdip[:, 2] + Gdip[:, 1] + 1e-300
+        )
+    np.clip(F, 0, 1, out=F)  # round to [0, 1]
 
     return F, tau
 
@@ -145,30 +291,50 @@ def update_c(post_c, READ2RG, n_rgs):
     n_rgs: number of rgs
     """
 
-    c = np.empty(n_rgs)
-
-    for r in range(n_rgs):
-        c[r] = np.mean(post_c[READ2RG == r])
+    sums = np.bincount(READ2RG, weights=post_c, minlength=n_rgs)
+    counts = np.bincount(READ2RG, minlength=n_rgs)
+    c = sums / np.maximum(counts, 1)
 
     return c
 
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _update_eb_kernel(post_x, R, F):
+    """single pass accumulating the four error/bias sums for update_eb"""
+    errors, not_errors, bias, not_bias = 0.0, 0.0, 0.0, 0.0
+
+    for i in prange(R.shape[0]):
+        if R[i] == 1:
+            if F[i] == 0:
+                # have error if i) not flipped , R==1, X=0 or ii) if flipped, R==1, X==1
+                errors += post_x[i, 0]
+                # have no_bias if i) not flipped , R==1, X=1 or ii) if flipped, R==1, X==0
+                not_bias += post_x[i, 1]
+            else:
+                errors += post_x[i, 1]
+                not_bias += post_x[i, 0]
+        else:
+            if F[i] == 0:
+                # have no_error if i) not flipped , R==0, X=0 or ii) if flipped, R==0, X==1
+                not_errors += post_x[i, 0]
+                # have bias if i) not flipped , R==0, X=1 or ii) if flipped, R==0, X==0
+                bias += post_x[i, 1]
+            else:
+                not_errors += post_x[i, 1]
+                bias += post_x[i, 0]
+
+    return errors, not_errors, bias, not_bias
+
+
 def update_eb(post_x, R, F, two_errors=True):
     """
     post_x : Pr(X_i = j |.)
     i.e. each row of post_x gives the prob that X is and, der, respectively
     """
-    R = R.astype("bool")
-    R = np.array(R, "bool")
-    # have error if i) not flipped , R==1, X=0 or ii) if flipped, R==1, X==1
-    errors = np.sum(post_x[R & ~F, 0]) + np.sum(post_x[R & F, 1])
-    # have no_error if i) not flipped , R==0, X=0 or ii) if flipped, R==0, X==1
-    not_errors = np.sum(post_x[~R & ~F, 0]) + np.sum(post_x[~R & F, 1])
-
-    # have bias if i) not flipped , R==0, X=1 or ii) if flipped, R==0, X==0
-    bias = np.sum(post_x[~R & ~F, 1]) + np.sum(post_x[~R & F, 0])
-    # have no_bias if i) not flipped , R==1, X=1 or ii) if flipped, R==1, X==0
-    not_bias = np.sum(post_x[R & ~F, 1]) + np.sum(post_x[R & F, 0])
+    # the int8 READS and bool FLIPPED arrays are used as-is; no per-call copies
+    errors, not_errors, bias, not_bias = _update_eb_kernel(
+        post_x, np.asarray(R), np.asarray(F)
+    )
 
     if two_errors:
         e = errors / (errors + not_errors) if errors + not_errors > 0 else 0
@@ -180,59 +346,120 @@ def update_eb(post_x, R, F, two_errors=True):
     return e, b
 
 
-def update_pars(pars, data, controller):
-    """update all parameters; 1 EM step"""
-    O = controller
-
-    pars = deepcopy(pars) if controller.copy_pars else pars
+def update_pars(pars, data, controller, out=None):
+    """update all parameters; 1 EM step
 
-    """ calc unconditional forward probs Pr(G), Pr(C), Pr(A)
-        - Pr(G | Z) are the probabilities of observing genotype G given what we know about the SFS,
-            assuming its not contaminant.
-                it's a L x 3 matrix, with entry (i,j) giving  P(G_i=j) for i=0,...L, j=0,1,2
-        - Pr(A | psi) probability of a derived allele given its contaminant
-                L x 1 vector, with entry (i) giving P(G_i=1 | contaminant)
-        - Pr(C | psi) probability of a derived allele given its contaminant
-                L x 1 vector, with entry (i) giving P(G_i=1 | contaminant)
+    if out is given, pars is copied into its buffers and out is updated,
+    avoiding a deepcopy of the parameter object
     """
-    fwd_g = fwd_p_g(data, pars)
-
-    fwd_a = data.psi  # size [L x 1]
-    fwd_c = pars.cont  # size [O x 1]
+    O = controller
 
-    """run backward algorithm to calculate Pr(O | .)"""
-    bwd_x = bwd_p_o_given_x(data.READS, data.FLIPPED_READS, pars.e, pars.b)
-    bwd_g1 = bwd_p_one_o_given_g(
-        bwd_x, fwd_a, fwd_c, data.READ2SNP, data.READ2RG, data.n_reads
-    )  # size [O x 3]
-    bwd_g = bwd_p_all_o_given_g(bwd_g1, data.READ2SNP, data.n_snps)
+    if out is not None and out is not pars:
+        pars = pars.copy_into(out)
+    else:
+        pars = deepcopy(pars) if controller.copy_pars else pars
+
+    # only compute the posteriors that are actually used
+    need_x = O.update_cont or O.update_eb
+    need_any = O.update_ftau or need_x
+
+    if O.use_numba:
+        """fused E-step: all needed posteriors in one kernel, see emissions_numba"""
+        post_g, post_c, post_x, _ = em_step_fused(
+            data.READS,
+            data.FLIPPED_READS,
+            data.READ2SNP,
+            data.READ2RG,
+            data.read_block_starts,
+            data.SNP2SFS,
+            data.diploid_mask,
+            np.asarray(data.psi, float),
+            pars.cont,
+            pars.e[0],
+            pars.b[0],
+            pars.F,
+            pars.tau,
+            O.update_ftau,
+            need_x,
+        )
+    else:
 
-    """remaining forward probs Pr(X| C=0, G), Pr(X | C=1, A), Pr(X | C, A G) """
-    fwd_x_cont = fwd_p_x_cont(fwd_a, data.READ2SNP)  # size [L x 1]
-    fwd_x_nocont = fwd_p_x_nocont(fwd_g, data.READ2SNP)  # size [L x 1]
-    fwd_x = fwd_p_x(fwd_x_cont, fwd_x_nocont, fwd_c, data.READ2RG)
+        """ calc unconditional forward probs Pr(G), Pr(C), Pr(A)
+            - Pr(G | Z) are the probabilities of observing genotype G given what we know about the SFS,
+                assuming its not contaminant.
+                    it's a L x 3 matrix, with entry (i,j) giving  P(G_i=j) for i=0,...L, j=0,1,2
+            - Pr(A | psi) probability of a derived allele given its contaminant
+                    L x 1 vector, with entry (i) giving P(G_i=1 | contaminant)
+            - Pr(C | psi) probability of a derived allele given its contaminant
+                    L x 1 vector, with entry (i) giving P(G_i=1 | contaminant)
+        """
+        fwd_g = fwd_p_g(data, pars) if need_any else None
+
+        fwd_a = data.psi  # size [L x 1]
+        fwd_c = pars.cont  # size [O x 1]
+
+        """run backward algorithm to calculate Pr(O | .)"""
+        if need_any:
+            bwd_x = bwd_p_o_given_x(data.READS, data.FLIPPED_READS, pars.e, pars.b)
+
+        if O.update_ftau:
+            bwd_g1 = bwd_p_one_o_given_g(
+                bwd_x, fwd_a, fwd_c, data.READ2SNP, data.READ2RG, data.n_reads
+            )  # size [O x 3]
+            bwd_g = bwd_p_all_o_given_g(
+                bwd_g1, data.READ2SNP, data.n_snps, data.read_block_starts
+            )
+            post_g = posterior_g(bwd_g, fwd_g)
+
+        """remaining forward probs Pr(X| C=0, G), Pr(X | C=1, A) """
+        if need_x:
+            fwd_x_cont = fwd_p_x_cont(fwd_a, data.READ2SNP)  # size [L x 1]
+            fwd_x_nocont = fwd_p_x_nocont(fwd_g, data.READ2SNP)  # size [L x 1]
+            if O.update_cont:
+                post_c = posterior_c(
+                    bwd_x, fwd_x_nocont, fwd_x_cont, fwd_c, data.READ2RG
+                )
+            if O.update_eb:
+                post_x = posterior_x(
+                    bwd_x, fwd_x_cont, fwd_x_nocont, fwd_c, data.READ2RG
+                )
 
     if O.update_ftau:
-        post_g = posterior_g(bwd_g, fwd_g)
         pars.prev_F[:], pars.prev_tau[:] = pars.F, pars.tau
         pars.F, pars.tau = update_ftau_numeric(
             pars.F, pars.tau, data, post_g, update_F=controller.update_F
         )
 
     if O.update_cont:
-        post_c = posterior_c(bwd_x, fwd_x_nocont, fwd_x_cont, fwd_c, data.READ2RG)
         pars.prev_cont[:] = pars.cont
         pars.cont = update_c(post_c, data.READ2RG, data.n_rgs)
 
     if O.update_eb:
-        post_x = posterior_x(bwd_x, fwd_x_cont, fwd_x_nocont, fwd_c, data.READ2RG)
         pars.prev_e, pars.prev_b = pars.e, pars.b
         pars.e, pars.b = update_eb(
             post_x, data.READS, data.FLIPPED_READS, two_errors=O.update_bias
         )
 
-    if O.do_ll:  # should be avoided since it runs the entire E-step
-        pars.ll, pars.prev_ll = calc_full_ll(data, pars), pars.ll
+    if O.do_ll:
+        if O.use_numba:
+            # single streaming pass, no intermediate arrays
+            ll = calc_ll_fused(
+                data.READS,
+                data.FLIPPED_READS,
+                data.READ2RG,
+                data.read_block_starts,
+                data.SNP2SFS,
+                data.diploid_mask,
+                np.asarray(data.psi, float),
+                pars.cont,
+                pars.e[0],
+                pars.b[0],
+                pars.F,
+                pars.tau,
+            )
+        else:  # should be avoided since it runs the entire E-step
+            ll = calc_full_ll(data, pars)
+        pars.ll, pars.prev_ll = ll, pars.ll
 
     return pars
 
@@ -245,43 +472,48 @@ def squarem(pars0, data, controller):
     min_step = controller.squarem_min
     max_step = controller.squarem_max
     pars = pars0
+    # all updates write into this fixed pool of spare parameter objects,
+    # so the hot loop does no deepcopies
+    pool = [deepcopy(pars0) for _ in range(5)]
 
     for i in range(controller.n_iter):
-        pars1 = update_pars(pars, data, controller)
-        Δp1 = pars1 - pars
-        if (
-            norm(Δp1) < controller.param_tol
-            or pars1.ll - pars1.prev_ll < controller.ll_tol
-        ):
+        free = [b for b in pool if b is not pars]
+        buf1, buf2, pars_scratch, buf_sq = free[:4]
+
+        pars1 = update_pars(pars, data, controller, out=buf1)
+        Δp1 = pars1.pars - pars.pars
+        norm1 = norm(Δp1)
+        if norm1 < controller.param_tol or pars1.ll - pars1.prev_ll < controller.ll_tol:
             pars = pars1
-            log_.info(f"stopping since parameters did not change in Δp1: {norm(Δp1)} ")
+            log_.info(f"stopping since parameters did not change in Δp1: {norm1} ")
             break
 
-        pars2 = update_pars(pars1, data, controller)
-        Δp2 = pars2 - pars1
-        if norm(Δp2) < controller.param_tol or pars2.ll - pars1.ll < controller.ll_tol:
+        pars2 = update_pars(pars1, data, controller, out=buf2)
+        Δp2 = pars2.pars - pars1.pars
+        norm2 = norm(Δp2)
+        if norm2 < controller.param_tol or pars2.ll - pars1.ll < controller.ll_tol:
             pars = pars2
             log_.info(
-                f"stopping since parameters did not change in Δp2: {norm(Δp2)}, {pars2.ll -pars1.ll} "
+                f"stopping since parameters did not change in Δp2: {norm2}, {pars2.ll -pars1.ll} "
             )
             break
 
         Δp3 = Δp2 - Δp1
 
-        step_size = norm(Δp1) / norm(Δp3)
+        step_size = norm1 / norm(Δp3)
         step_size = np.clip(step_size, min_step, max_step)
 
-        pars_sq = deepcopy(pars2)
-        pars_sq.pars[:] = pars.pars + 2 * step_size * Δp1 + step_size * step_size * Δp3
+        pars_scratch.pars[:] = (
+            pars.pars + 2 * step_size * Δp1 + step_size * step_size * Δp3
+        )
 
-        # "stabilization step if all parameters are in bounds
-        if np.all(0 <= pars_sq.pars) and np.all(pars_sq.pars <= 1):
-            pass
-        else:
-            pars_sq.pars[pars_sq.pars < 0] = EPS
-            pars_sq.pars[pars_sq.pars > 1] = 1 - EPS
+        # "stabilization step: clamp parameters into bounds, single pass
+        out_of_bounds = (pars_scratch.pars < 0) | (pars_scratch.pars > 1)
+        if out_of_bounds.any():
+            np.clip(pars_scratch.pars, EPS, 1 - EPS, out=pars_scratch.pars)
 
-        pars_sq = update_pars(pars_sq, data, controller)
+        pars_scratch.ll = pars2.ll
+        pars_sq = update_pars(pars_scratch, data, controller, out=buf_sq)
 
         log_.info(
             f"LLs p0 {pars.ll:.4f} | p1 {pars1.ll-pars.ll:.4f} | p2 {pars2.ll-pars1.ll:.4f} | psq {pars_sq.ll-pars2.ll:.4f}"
@@ -302,7 +534,7 @@ def squarem(pars0, data, controller):
         s = f"iter {i}: step: {step_size:.3f} | ll: {pars.ll:4f} "
         s += f"Δll : {pars.delta_ll:.6f} | e={pars.e[0]:.4f} | b={pars.b[0]:.4f}"
         s += f" | Δc : {pars.delta_cont:.4f} | Δtau : {pars.delta_tau:.4f} | ΔF : {pars.delta_F:.4f}"
-        s += f" | Δ1 : {norm(Δp1):.4f}| Δ2:{norm(Δp2):.4f} "
+        s += f" | Δ1 : {norm1:.4f}| Δ2:{norm2:.4f} "
         log_.info(s)
 
     return pars
@@ -1,5 +1,5 @@
 import numpy as np
-from numba import njit
+from numba import njit, prange
 from math import lgamma, exp, pow
 from copy import deepcopy
 
@@ -53,9 +53,10 @@ def fwd_p_g(data, pars):
     """calculate forward probabilities of genotypes"""
     fwd_g = p_gt_diploid(pars.tau, pars.F, SNP2SFS=data.SNP2SFS)  # size [L x 3]
     if data.haploid_snps is not None:
-        fwd_g[data.haploid_snps] = p_gt_haploid(
+        haploid_mask = ~data.diploid_mask
+        fwd_g[haploid_mask] = p_gt_haploid(
             pars.tau,
-            SNP2SFS=data.SNP2SFS[data.haploid_snps],
+            SNP2SFS=data.SNP2SFS[haploid_mask],
         )
     return fwd_g
 
@@ -135,18 +136,28 @@ def bwd_p_one_o_given_g(bwd_x, fwd_a, fwd_c, READ2SNP, READ2RG, n_reads):
     return bwd_g
 
 
-@njit(cache=True)
-def bwd_p_all_o_given_g(bwd_g1, READ2SNP, n_snps):
+@njit(parallel=True, cache=True)
+def bwd_p_all_o_given_g(bwd_g1, READ2SNP, n_snps, read_block_starts=None):
     """
     calculate  ℙ(O_l | G_l) = ∏_r ∏_j ℙ(O_lrj | G_l)
 
     where ℙ(O_lrj = 1 | G_l) = (c_r)psi_l * (1-c_r) G_l / 2.
     and   ℙ(O_lrj = 0 | G_l) = (c_r) (1 - psi_l) * (1-c_r) (1 - G_l / 2).
+
+    READ2SNP must be sorted (SlugReads stores reads sorted by SNP), so each
+    SNP's product reduces over a contiguous block of reads; pass the cached
+    SlugReads.read_block_starts to skip re-deriving the block offsets
     """
     bwd_g = np.ones((n_snps, 3))
+    if read_block_starts is None:
+        indptr = np.searchsorted(READ2SNP, np.arange(n_snps + 1))
+    else:
+        indptr = read_block_starts
 
-    for read, snp in enumerate(READ2SNP):
-        bwd_g[snp] *= bwd_g1[read]
+    for snp in prange(n_snps):
+        for read in range(indptr[snp], indptr[snp + 1]):
+            for j in range(3):
+                bwd_g[snp, j] *= bwd_g1[read, j]
 
     return bwd_g
 
@@ -229,7 +240,9 @@ def full_posterior_genotypes(data, pars):
     bwd_g1 = bwd_p_one_o_given_g(
         bwd_x, data.psi, pars.cont, data.READ2SNP, data.READ2RG, data.n_reads
     )
-    bwd_g = bwd_p_all_o_given_g(bwd_g1, data.READ2SNP, data.n_snps)
+    bwd_g = bwd_p_all_o_given_g(
+        bwd_g1, data.READ2SNP, data.n_snps, data.read_block_starts
+    )
 
     return bwd_g, posterior_g(bwd_g, fwd_g)
 
@@ -257,7 +270,9 @@ def calc_full_ll(data, pars):
     bwd_g1 = bwd_p_one_o_given_g(
         bwd_x, data.psi, pars.cont, data.READ2SNP, data.READ2RG, data.n_reads
     )
-    bwd_g = bwd_p_all_o_given_g(bwd_g1, data.READ2SNP, data.n_snps)
+    bwd_g = bwd_p_all_o_given_g(
+        bwd_g1, data.READ2SNP, data.n_snps, data.read_block_starts
+    )
     ll2 = calc_ll(fwd_g, bwd_g)
     return ll2
 
@@ -0,0 +1,185 @@
+"""fused single-kernel E-step for admixslug
+
+replicates the staged pipeline in emissions.py (bwd_p_o_given_x →
+bwd_p_one_o_given_g → bwd_p_all_o_given_g → posterior_g / posterior_x /
+posterior_c) in one jitted kernel that streams over reads and SNPs, so the
+per-read intermediates are never materialized as full arrays
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def calc_ll_fused(
+    READS,
+    FLIPPED_READS,
+    READ2RG,
+    read_block_starts,
+    SNP2SFS,
+    diploid_mask,
+    psi,
+    cont,
+    e,
+    b,
+    F,
+    tau,
+):
+    """log-likelihood of the data given the current parameters
+
+    equivalent to calc_full_ll, but computed in one streaming pass over
+    the per-SNP read blocks without materializing any intermediate array
+    """
+    n_snps = SNP2SFS.shape[0]
+    ll = 0.0
+
+    for s in prange(n_snps):
+        t = tau[SNP2SFS[s]]
+        f = F[SNP2SFS[s]] if diploid_mask[s] else 1.0
+        g0 = f * (1 - t) + (1 - f) * (1 - t) ** 2
+        g1 = (1 - f) * 2 * t * (1 - t)
+        g2 = f * t + (1 - f) * t * t
+
+        a = psi[s]
+        b0, b1, b2 = 1.0, 1.0, 1.0
+        for i in range(read_block_starts[s], read_block_starts[s + 1]):
+            c = cont[READ2RG[i]]
+            if READS[i] == 1:
+                if FLIPPED_READS[i]:
+                    bx0, bx1 = 1 - b, e
+                else:
+                    bx0, bx1 = e, 1 - b
+            else:
+                if FLIPPED_READS[i]:
+                    bx0, bx1 = b, 1 - e
+                else:
+                    bx0, bx1 = 1 - b, e
+
+            p_o_cont = (bx0 * (1 - a) + bx1 * a) * c
+            b0 *= p_o_cont + bx0 * (1 - c)
+            b1 *= p_o_cont + (bx0 * 0.5 + bx1 * 0.5) * (1 - c)
+            b2 *= p_o_cont + bx1 * (1 - c)
+
+        ll += np.log(g0 * b0 + g1 * b1 + g2 * b2)
+
+    return ll
+
+
+@njit(parallel=True, cache=True)
+def em_step_fused(
+    READS,
+    FLIPPED_READS,
+    READ2SNP,
+    READ2RG,
+    read_block_starts,
+    SNP2SFS,
+    diploid_mask,
+    psi,
+    cont,
+    e,
+    b,
+    F,
+    tau,
+    need_g=True,
+    need_x=True,
+):
+    """calculate all E-step posteriors of one EM iteration in two passes
+
+    Parameters mirror the staged functions in emissions.py; e and b are
+    scalars, F and tau are the SFS parameter vectors. need_g and need_x
+    gate the genotype and read-level posteriors: when off, the
+    corresponding passes are skipped and empty arrays are returned, so
+    e.g. a contamination-only run never materializes post_g
+
+    Returns
+    -------
+    post_g : np.ndarray[L x 3]
+        Pr(G_l = j | O); empty if need_g is off
+    post_c : np.ndarray[R x 1]
+        Pr(C_i = 1 | O_i); empty if need_x is off
+    post_x : np.ndarray[R x 2]
+        Pr(X_i = j | O_i); empty if need_x is off
+    ll : float
+        log-likelihood Σ_l log Σ_j Pr(G_l = j) Pr(O | G_l = j); 0 if
+        need_g is off
+    """
+    n_snps = SNP2SFS.shape[0]
+    n_reads = READS.shape[0]
+
+    # Pr(G_l | F, tau); haploid SNPs use F=1 as in fwd_p_g
+    fwd_g = np.empty((n_snps, 3))
+    for s in prange(n_snps):
+        t = tau[SNP2SFS[s]]
+        f = F[SNP2SFS[s]] if diploid_mask[s] else 1.0
+        fwd_g[s, 0] = f * (1 - t) + (1 - f) * (1 - t) ** 2
+        fwd_g[s, 1] = (1 - f) * 2 * t * (1 - t)
+        fwd_g[s, 2] = f * t + (1 - f) * t * t
+
+    bwd_g1 = np.empty((n_reads if need_g else 0, 3))
+    post_c = np.empty(n_reads if need_x else 0)
+    post_x = np.empty((n_reads if need_x else 0, 2))
+
+    for i in prange(n_reads):
+        snp = READ2SNP[i]
+        c = cont[READ2RG[i]]
+        a = psi[snp]
+
+        # Pr(O_i | X_i = j); same table as bwd_p_o_given_x
+        if READS[i] == 1:
+            if FLIPPED_READS[i]:
+                bx0, bx1 = 1 - b, e
+            else:
+                bx0, bx1 = e, 1 - b
+        else:
+            if FLIPPED_READS[i]:
+                bx0, bx1 = b, 1 - e
+            else:
+                bx0, bx1 = 1 - b, e
+
+        if need_g:
+            # Pr(O_i | G = j) for a single read; cont is independent of genotype
+            p_o_cont = (bx0 * (1 - a) + bx1 * a) * c
+            for j in range(3):
+                z = j / 2.0
+                bwd_g1[i, j] = p_o_cont + (bx0 * (1 - z) + bx1 * z) * (1 - c)
+
+        if need_x:
+            # forward probs Pr(X | C=1, psi) and Pr(X | C=0, G)
+            fx_cont0, fx_cont1 = 1 - a, a
+            fx_nocont0 = fwd_g[snp, 0] + fwd_g[snp, 1] * 0.5
+            fx_nocont1 = fwd_g[snp, 2] + fwd_g[snp, 1] * 0.5
+
+            # Pr(C_i | O_i), as in posterior_c
+            x_cont = (fx_cont0 * bx0 + fx_cont1 * bx1) * c
+            x_nocont = (fx_nocont0 * bx0 + fx_nocont1 * bx1) * (1 - c)
+            post_c[i] = x_cont / (x_cont + x_nocont)
+
+            # Pr(X_i | O_i), as in posterior_x
+            px0 = ((1 - c) * fx_nocont0 + c * fx_cont0) * bx0
+            px1 = ((1 - c) * fx_nocont1 + c * fx_cont1) * bx1
+            post_x[i, 0] = px0 / (px0 + px1)
+            post_x[i, 1] = px1 / (px0 + px1)
+
+    post_g = np.empty((n_snps if need_g else 0, 3))
+    ll = 0.0
+    if need_g:
+        # ℙ(O_l | G_l) = ∏_r ℙ(O_lr | G_l); reads are sorted by SNP, so each SNP
+        # reduces over its own contiguous block without write conflicts
+        bwd_g = np.ones((n_snps, 3))
+        for s in prange(n_snps):
+            for i in range(read_block_starts[s], read_block_starts[s + 1]):
+                for j in range(3):
+                    bwd_g[s, j] *= bwd_g1[i, j]
+
+        # Pr(G_l | O) and the log-likelihood of the entering parameters
+        for s in prange(n_snps):
+            tot = (
+                fwd_g[s, 0] * bwd_g[s, 0]
+                + fwd_g[s, 1] * bwd_g[s, 1]
+                + fwd_g[s, 2] * bwd_g[s, 2]
+            )
+            for j in range(3):
+                post_g[s, j] = fwd_g[s, j] * bwd_g[s, j] / tot
+            ll += np.log(tot)
+
+    return post_g, post_c, post_x, ll
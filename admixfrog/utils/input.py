@@ -312,7 +312,7 @@ def load_read_data(
         return data, None
 
 
-@njit
+@njit(cache=True)
 def nfp(chrom, pos, n_snps, filter_pos):
     kp = np.ones(n_snps, np.bool_)
     prev_chrom, prev_pos = -1, -10_000_000
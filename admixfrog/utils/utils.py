@@ -403,7 +403,7 @@ def obs2sfs(snp, flipped, states, max_states=None, sex_chroms=["Z", "W", "X", "Y
     return sfs_rows, SNP2SFS
 
 
-@njit
+@njit(cache=True)
 def make_full_read_df(df, n_reads):
     """generate vectors relating read groups to allele they carry, read group and snp
 
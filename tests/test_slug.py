@@ -1,6 +1,8 @@
 from admixfrog.slug.classes import *
 from admixfrog.slug.emissions import *
 from admixfrog.slug.em import *
+from admixfrog.slug.em import _solve_ftau_batch
+from scipy.optimize import minimize
 import numpy as np
 import pytest
 
@@ -183,3 +185,168 @@ def test_cont_est():
     ll = calc_full_ll(reads, pars)
     assert pars.ll <= ll
     print(f"ll : {pars.ll} -> {ll}")
+
+
+def _ftau_ll(G, tau, F):
+    """log-likelihood of aggregated genotype posteriors G for one SFS category"""
+    c0 = F * (1 - tau) + (1 - F) * (1 - tau) ** 2
+    c1 = (1 - F) * 2 * tau * (1 - tau)
+    c2 = F * tau + (1 - F) * tau * tau
+    return G[0] * np.log(c0) + G[1] * np.log(c1) + G[2] * np.log(c2)
+
+
+def _scipy_ftau_ref(G, tau0=0.5, F0=0.5):
+    """per-category scipy fit, the reference the vectorized M-step replaced"""
+    LO, HI = 1e-10, 1 - 1e-10
+    OO = minimize(
+        lambda args: -_ftau_ll(G, *args),
+        (tau0, F0),
+        bounds=((LO, HI), (LO, HI)),
+        method="L-BFGS-B",
+    )
+    return OO.x
+
+
+def test_update_ftau_numeric():
+    """the vectorized tau/F M-step matches a per-category scipy fit
+
+    covers the special-cased paths: interior optima, G1=0 (F pinned at the
+    upper bound), F at the lower bound, and categories without data
+    """
+    G = np.array(
+        [
+            [3.0, 4.0, 5.0],  # interior optimum
+            [10.0, 1.0, 0.1],
+            [5.0, 0.0, 7.0],  # G1=0: F is pushed to the upper bound
+            [0.0, 10.0, 0.0],  # F at the lower bound
+            [0.0, 0.0, 0.0],  # no data: old values are kept
+            [1e6, 2e3, 1e6],
+        ]
+    )
+    n_sfs = G.shape[0]
+
+    # one SNP per SFS category, so the posterior sums equal G directly
+    data = SlugReads(
+        READS=[0],
+        psi=np.zeros(n_sfs),
+        READ2RG=[0],
+        READ2SNP=[0],
+        FLIPPED=np.zeros(n_sfs, bool),
+        SNP2SFS=np.arange(n_sfs),
+    )
+
+    old_tau, old_F = np.full(n_sfs, 0.4), np.full(n_sfs, 0.3)
+    F, tau = update_ftau_numeric(old_F, old_tau, data, post_g=G)
+
+    assert tau[4] == old_tau[4] and F[4] == old_F[4]
+    assert np.isclose(tau[2], 7 / 12) and F[2] > 1 - 1e-4
+    assert np.isclose(tau[3], 0.5) and F[3] < 1e-4
+
+    for k in np.where(G.sum(1) > 0)[0]:
+        x = _scipy_ftau_ref(G[k], old_tau[k], old_F[k])
+        assert _ftau_ll(G[k], tau[k], F[k]) >= _ftau_ll(G[k], *x) - 1e-6
+
+
+def test_solve_ftau_batch():
+    """the jitted Newton fallback agrees with scipy from poor starting points
+
+    exercised directly, since update_ftau_numeric only reaches it for
+    categories where the vectorized F-update fails to converge
+    """
+    G = np.array(
+        [
+            [3.0, 4.0, 5.0],
+            [1e6, 1.0, 1.0],
+            [1e-3, 1e-3, 1e3],
+            [0.0, 0.0, 5.0],
+            [2.0, 1000.0, 2.0],
+        ]
+    )
+    tau = np.full(G.shape[0], 0.999)
+    F = np.full(G.shape[0], 0.001)
+    conv = _solve_ftau_batch(G, tau, F, n_iter=100)
+
+    assert np.sum(conv) >= 3
+    for k in np.where(conv)[0]:
+        x = _scipy_ftau_ref(G[k])
+        assert _ftau_ll(G[k], tau[k], F[k]) >= _ftau_ll(G[k], *x) - 1e-6
+
+
+def test_em_step_fused():
+    """the fused numba E-step matches the staged emissions pipeline
+
+    random data with haploid SNPs, flipped alleles and several read groups,
+    so every branch of the fused emission table is hit
+    """
+    np.random.seed(0)
+    n_snps, n_reads, n_rgs, n_sfs = 40, 200, 3, 5
+
+    data = SlugReads(
+        READS=np.random.randint(0, 2, n_reads),
+        psi=np.random.uniform(0, 1, n_snps),
+        READ2RG=np.random.randint(0, n_rgs, n_reads),
+        READ2SNP=np.random.randint(0, n_snps, n_reads),
+        SNP2SFS=np.random.randint(0, n_sfs, n_snps),
+        FLIPPED=np.random.randint(0, 2, n_snps).astype(bool),
+        haploid_snps=np.arange(n_snps - 10, n_snps),
+    )
+    assert data.n_rgs == n_rgs and data.n_sfs == n_sfs
+
+    pars = SlugPars(
+        cont=np.random.uniform(0.1, 0.9, n_rgs),
+        tau=np.random.uniform(0.1, 0.9, n_sfs),
+        F=np.random.uniform(0, 1, n_sfs),
+        e=0.01,
+        b=0.03,
+    )
+
+    # staged pipeline, one function per quantity
+    fwd_g = fwd_p_g(data, pars)
+    bwd_x = bwd_p_o_given_x(data.READS, data.FLIPPED_READS, pars.e, pars.b)
+    bwd_g1 = bwd_p_one_o_given_g(
+        bwd_x, data.psi, pars.cont, data.READ2SNP, data.READ2RG, data.n_reads
+    )
+    bwd_g = bwd_p_all_o_given_g(bwd_g1, data.READ2SNP, data.n_snps)
+    exp_g = posterior_g(bwd_g, fwd_g)
+
+    fwd_x_cont = fwd_p_x_cont(data.psi, data.READ2SNP)
+    fwd_x_nocont = fwd_p_x_nocont(fwd_g, data.READ2SNP)
+    exp_c = posterior_c(bwd_x, fwd_x_nocont, fwd_x_cont, pars.cont, data.READ2RG)
+    exp_x = posterior_x(bwd_x, fwd_x_cont, fwd_x_nocont, pars.cont, data.READ2RG)
+
+    post_g, post_c, post_x, _ = em_step_fused(
+        data.READS,
+        data.FLIPPED_READS,
+        data.READ2SNP,
+        data.READ2RG,
+        data.read_block_starts,
+        data.SNP2SFS,
+        data.diploid_mask,
+        np.asarray(data.psi, float),
+        pars.cont,
+        pars.e[0],
+        pars.b[0],
+        pars.F,
+        pars.tau,
+    )
+
+    assert np.allclose(post_g, exp_g)
+    assert np.allclose(post_c, exp_c)
+    assert np.allclose(post_x, exp_x)
+
+    # the fused log-likelihood drives the squarem stopping decisions
+    ll = calc_ll_fused(
+        data.READS,
+        data.FLIPPED_READS,
+        data.READ2RG,
+        data.read_block_starts,
+        data.SNP2SFS,
+        data.diploid_mask,
+        np.asarray(data.psi, float),
+        pars.cont,
+        pars.e[0],
+        pars.b[0],
+        pars.F,
+        pars.tau,
+    )
+    assert np.allclose(ll, calc_full_ll(data, pars))